@@ -0,0 +1,125 @@
+"""
+UI latency benchmark for the keystroke and locker selection paths of gui.py.
+
+Runs under the offscreen Qt platform, so no display is needed:
+    python benchmark_gui.py [--lockers 500] [--keystrokes 200]
+
+Exits with a non-zero code if any path's p95 latency exceeds one 60 Hz frame.
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+# send_automated_email refuses to import without a client ID. No email is sent here.
+os.environ.setdefault("APPLICATION_CLIENT_ID", "benchmark")
+
+from PyQt6.QtWidgets import QApplication, QGroupBox, QGridLayout
+from PyQt6.QtTest import QTest
+from gui import LockerGUI, LockerWidget, LOCKER_STYLESHEET
+
+FRAME_BUDGET_MS = 1000 / 60
+# Fields are cleared before they reach this length so every keystroke is accepted.
+# The job number's QIntValidator rejects digits once the value would overflow a 32-bit int.
+MAX_TYPED_LENGTH = 9
+
+
+class BenchmarkGUI(LockerGUI):
+    """LockerGUI without the ESP32: no connection dialog on startup and no backup deletion on close."""
+    def initialize_system(self):
+        pass
+
+    def closeEvent(self, event):
+        event.accept()
+
+
+def measure(action, repeats: int, prepare=None) -> list[float]:
+    """
+    Runs action(i) repeats times and returns each call's latency in milliseconds.
+    prepare(i), if given, runs before each call outside the timed region.
+    Pending events are processed inside the timed region, so the repaint and
+    re-layout the action causes are counted as part of its frame.
+    """
+    QApplication.processEvents()
+    timings = []
+    for i in range(repeats):
+        if prepare:
+            prepare(i)
+            QApplication.processEvents()
+        start = time.perf_counter()
+        action(i)
+        QApplication.processEvents()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label: str, timings: list[float]) -> bool:
+    p95 = statistics.quantiles(timings, n=20)[-1]
+    within_budget = p95 < FRAME_BUDGET_MS
+    print(f"{label:<24} mean {statistics.mean(timings):7.3f} ms   p95 {p95:7.3f} ms   max {max(timings):7.3f} ms   {'OK' if within_budget else 'OVER BUDGET'}")
+    return within_budget
+
+
+def add_lockers(window: BenchmarkGUI, count: int):
+    """Adds a large grid of extra lockers to the window, wired like the real ones."""
+    groupbox = QGroupBox("Benchmark Lockers")
+    grid_layout = QGridLayout()
+    columns = 25
+    for i in range(count):
+        locker_id = f"B{i:04d}"
+        locker_widget = LockerWidget(locker_id, is_occupied=(i % 3 == 0))
+        locker_widget.clicked_signal.connect(window.on_locker_selected)
+        grid_layout.addWidget(locker_widget, i // columns, i % columns)
+        window.locker_widgets[locker_id] = locker_widget
+    groupbox.setLayout(grid_layout)
+    groupbox.setStyleSheet(LOCKER_STYLESHEET)
+    window.main_layout.addWidget(groupbox)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark GUI keystroke and selection latency.")
+    parser.add_argument("--lockers", type=int, default=500, help="extra lockers to add to the grid")
+    parser.add_argument("--keystrokes", type=int, default=200, help="keystrokes typed into each field")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    window = BenchmarkGUI()
+    add_lockers(window, args.lockers)
+    window.show()
+
+    locker_ids = list(window.locker_widgets)
+    fields = [window.name_input, window.email_input, window.jobid_input, window.password_input]
+    results = []
+
+    def clear_full_field(i):
+        field = fields[i % len(fields)]
+        if len(field.text()) >= MAX_TYPED_LENGTH:
+            field.clear()
+
+    def type_key(i):
+        field = fields[i % len(fields)]
+        before = field.text()
+        QTest.keyClick(field, "1")
+        assert field.text() != before, f"keystroke rejected by {field.placeholderText()!r}"
+
+    def validate(i):
+        # Alternate between valid and invalid text so every run re-colours a field
+        window.email_input.setText("user@example.com" if i % 2 else "user@")
+        window.update_button_states()
+
+    def select_locker(i):
+        window.on_locker_selected(locker_ids[i % len(locker_ids)])
+
+    results.append(report("keystroke", measure(type_key, args.keystrokes * len(fields), prepare=clear_full_field)))
+    results.append(report("debounced validation", measure(validate, args.keystrokes)))
+    results.append(report(f"select ({len(locker_ids)} lockers)", measure(select_locker, len(locker_ids))))
+
+    window.close()
+    app.quit()
+    return 0 if all(results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -14,6 +14,37 @@ from send_automated_email import send_automated_email
 
 EMAIL_REGEX = re.compile(r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$')
 
+# Delay (ms) after the last keystroke before the input fields are re-validated
+VALIDATION_DEBOUNCE_MS = 150
+
+# Applied once to the user input group. Fields are coloured through their "valid"
+# dynamic property so a keystroke never has to parse a new stylesheet.
+INPUT_STYLESHEET = """
+    QLineEdit[valid="true"] { border: 2px solid #388E3C; }
+    QLineEdit[valid="false"] { border: 2px solid #D32F2F; }
+"""
+
+# Applied once to the lockers group. Lockers are coloured through their "occupied" and
+# "selected" dynamic properties, the same way the input fields use "valid".
+LOCKER_STYLESHEET = """
+    QPushButton { background-color: #388E3C; color: white; font-weight: bold; border: 1px solid #555; border-radius: 4px; min-height: 50px; min-width: 50px; }
+    QPushButton[selected="true"] { background-color: #4CAF50; border: 3px solid black; }
+    QPushButton[occupied="true"] { background-color: #D32F2F; }
+    QPushButton:hover { background-color: #E0E0E0; color: black; }
+"""
+
+def repolish(widget: QWidget):
+    """Re-applies the parent's stylesheet after one of the widget's dynamic properties changed."""
+    widget.style().unpolish(widget)
+    widget.style().polish(widget)
+
+def set_input_valid(line_edit: QLineEdit, is_valid: bool):
+    """Marks an input field as valid/invalid, re-polishing it only when the state changes."""
+    if line_edit.property("valid") == is_valid:
+        return
+    line_edit.setProperty("valid", is_valid)
+    repolish(line_edit)
+
 # --- Custom Locker Widget ---
 class LockerWidget(QPushButton):
     clicked_signal = pyqtSignal(str)
@@ -27,14 +58,12 @@ class LockerWidget(QPushButton):
     def _handle_click(self):
         self.clicked_signal.emit(self.locker_id)
     def update_style(self):
-        if self.is_occupied:
-            color, border = ("#D32F2F", "3px solid black" if self.is_selected else "1px solid #555")
-        else:
-            color, border = ("#4CAF50" if self.is_selected else "#388E3C", "3px solid black" if self.is_selected else "1px solid #555")
-        self.setStyleSheet(f"""
-            QPushButton {{ background-color: {color}; color: white; font-weight: bold; border: {border}; border-radius: 4px; min-height: 50px; min-width: 50px; }}
-            QPushButton:hover {{ background-color: #E0E0E0; color: black; }}
-        """)
+        # Only re-polish when the state actually changed
+        if self.property("occupied") == self.is_occupied and self.property("selected") == self.is_selected:
+            return
+        self.setProperty("occupied", self.is_occupied)
+        self.setProperty("selected", self.is_selected)
+        repolish(self)
 
 
 # --- Main Application Window ---
@@ -52,6 +81,14 @@ class LockerGUI(QWidget):
         self.is_jobid_valid = False
         self.is_password_valid = False # New state for password validation
 
+        # Debounced validation: keystrokes only mark a field as pending and restart the timer
+        self.validators = {}
+        self.pending_validation = set()
+        self.validation_timer = QTimer(self)
+        self.validation_timer.setSingleShot(True)
+        self.validation_timer.setInterval(VALIDATION_DEBOUNCE_MS)
+        self.validation_timer.timeout.connect(self.update_button_states)
+
         # Layouts and Widgets
         self.main_layout = QVBoxLayout(self)
         self.create_user_input_group()
@@ -86,26 +123,30 @@ class LockerGUI(QWidget):
         # Name
         self.name_input = QLineEdit()
         self.name_input.setPlaceholderText("Enter user's full name")
-        self.name_input.textChanged.connect(self.validate_name)
+        self.name_input.textChanged.connect(lambda _: self.schedule_validation(self.name_input))
+        self.validators[self.name_input] = self.validate_name
         layout.addRow(QLabel("Name:"), self.name_input)
         
         # Email
         self.email_input = QLineEdit()
         self.email_input.setPlaceholderText("Enter a valid email address")
-        self.email_input.textChanged.connect(self.validate_email)
+        self.email_input.textChanged.connect(lambda _: self.schedule_validation(self.email_input))
+        self.validators[self.email_input] = self.validate_email
         layout.addRow(QLabel("Email:"), self.email_input)
 
         # Job Number
         self.jobid_input = QLineEdit()
         self.jobid_input.setPlaceholderText("Enter job number")
         self.jobid_input.setValidator(QIntValidator())
-        self.jobid_input.textChanged.connect(self.validate_jobid)
+        self.jobid_input.textChanged.connect(lambda _: self.schedule_validation(self.jobid_input))
+        self.validators[self.jobid_input] = self.validate_jobid
         layout.addRow(QLabel("Job Number:"), self.jobid_input)
 
         # Password
         self.password_input = QLineEdit()
         self.password_input.setPlaceholderText("Enter or generate a password")
-        self.password_input.textChanged.connect(self.validate_password)
+        self.password_input.textChanged.connect(lambda _: self.schedule_validation(self.password_input))
+        self.validators[self.password_input] = self.validate_password
         
         generate_pass_button = QPushButton("Generate")
         generate_pass_button.clicked.connect(self.generate_password)
@@ -116,6 +157,7 @@ class LockerGUI(QWidget):
         layout.addRow(QLabel("Password:"), password_layout)
 
         user_groupbox.setLayout(layout)
+        user_groupbox.setStyleSheet(INPUT_STYLESHEET)
         self.main_layout.addWidget(user_groupbox)
 
     def generate_password(self):
@@ -137,6 +179,7 @@ class LockerGUI(QWidget):
             grid_layout.addWidget(locker_widget, row, col, r_span, c_span)
             self.locker_widgets[locker_id] = locker_widget
         lockers_groupbox.setLayout(grid_layout)
+        lockers_groupbox.setStyleSheet(LOCKER_STYLESHEET)
         self.main_layout.addWidget(lockers_groupbox)
         self.main_layout.addStretch()
 
@@ -179,6 +222,8 @@ class LockerGUI(QWidget):
             widget.update_style()
 
     def on_locker_selected(self, locker_id: str):
+        if locker_id == self.selected_locker_id:
+            return
         if self.selected_locker_id and self.selected_locker_id in self.locker_widgets:
             self.locker_widgets[self.selected_locker_id].is_selected = False
             self.locker_widgets[self.selected_locker_id].update_style()
@@ -189,31 +234,39 @@ class LockerGUI(QWidget):
 
     def validate_name(self, text: str):
         self.is_name_valid = bool(text.strip())
-        self.name_input.setStyleSheet("border: 2px solid #388E3C;" if self.is_name_valid else "border: 2px solid #D32F2F;")
-        self.update_button_states()
+        set_input_valid(self.name_input, self.is_name_valid)
 
     def validate_email(self, text: str):
         self.is_email_valid = bool(EMAIL_REGEX.match(text)) if text else False
-        self.email_input.setStyleSheet("border: 2px solid #388E3C;" if self.is_email_valid else "border: 2px solid #D32F2F;")
-        self.update_button_states()
+        set_input_valid(self.email_input, self.is_email_valid)
 
     def validate_jobid(self, text: str):
         self.is_jobid_valid = bool(text.strip())
-        self.jobid_input.setStyleSheet("border: 2px solid #388E3C;" if self.is_jobid_valid else "border: 2px solid #D32F2F;")
-        self.update_button_states()
+        set_input_valid(self.jobid_input, self.is_jobid_valid)
 
     def validate_password(self, text: str):
         self.is_password_valid = len(text.strip()) >= 4 # Example: require at least 4 digits
-        self.password_input.setStyleSheet("border: 2px solid #388E3C;" if self.is_password_valid else "border: 2px solid #D32F2F;")
-        self.update_button_states()
+        set_input_valid(self.password_input, self.is_password_valid)
+
+    def schedule_validation(self, line_edit: QLineEdit):
+        """Queues a field for validation once typing pauses for VALIDATION_DEBOUNCE_MS."""
+        self.pending_validation.add(line_edit)
+        self.validation_timer.start()
+
+    def flush_validation(self):
+        """Validates every pending field now, so the is_*_valid flags are never stale."""
+        self.validation_timer.stop()
+        for line_edit in self.pending_validation:
+            self.validators[line_edit](line_edit.text())
+        self.pending_validation.clear()
 
     def update_button_states(self):
+        self.flush_validation()
         locker_is_selected = self.selected_locker_id is not None
         if not locker_is_selected:
             self.make_occupy_email_button.setEnabled(False)
             self.make_occupy_no_email_button.setEnabled(False)
             self.unlock_button.setEnabled(False)
-            self.unlock_no_delete_button.setEnabled(False)
             return
 
         is_occupied = self.locker_widgets[self.selected_locker_id].is_occupied
@@ -225,7 +278,6 @@ class LockerGUI(QWidget):
 
         # Enable unlock buttons only if a locker is selected and it IS occupied.
         self.unlock_button.setEnabled(locker_is_selected and is_occupied)
-        self.unlock_no_delete_button.setEnabled(locker_is_selected and is_occupied)
 
     def run_unlock_process(self):
         locker_id = self.selected_locker_id
@@ -237,6 +289,7 @@ class LockerGUI(QWidget):
 
         try:
             self.esp32_manager.send_unlock_signal(locker_id)
+            locker_logic.record_event(locker_id, "release")
             QMessageBox.information(self, "Signal Sent", f"Unlock signal sent to locker {locker_id}.")
         except Exception as e:
             QMessageBox.critical(self, "Signal Failed", f"Failed to send unlock signal to ESP32: {e}")
@@ -244,6 +297,12 @@ class LockerGUI(QWidget):
         
         
     def run_occupy_process(self, send_email: bool):
+        # The button may have been clicked before a pending validation ran
+        if self.pending_validation:
+            self.update_button_states()
+            if not self.make_occupy_email_button.isEnabled():
+                return
+
         locker_id = self.selected_locker_id
         name = self.name_input.text().strip()
         email = self.email_input.text().strip()
@@ -278,6 +337,7 @@ class LockerGUI(QWidget):
                 self.reset_ui_state()
                 return
 
+        locker_logic.record_event(locker_id, "assign")
         QMessageBox.information(self, "Success", f"Locker {locker_id} assigned to {name}.")
         self.locker_widgets[locker_id].is_occupied = True
         self.reset_ui_state()
@@ -2,26 +2,86 @@ import json
 import os
 import random
 import string
+from datetime import datetime
 
 # Define the path to the local data file.
 # The GUI and Bluetooth service will use this path.
 DATA_FILE = './data/details.json'
 
+# Append-only log of assign/release events, one "timestamp,locker_id,action" row per line.
+# Events are recorded by the GUI once an action has fully succeeded, so rolled back attempts never appear.
+# details.json only holds the current snapshot, so this is what occupancy_analytics.py reads.
+HISTORY_FILE = './data/history.csv'
+
 
 """
-We only need these three functions because locker_logic does not interact with the WIFI module. It solely deal with the 
+We only need these functions because locker_logic does not interact with the WIFI module. It solely deal with the 
 logic of properly maintaining json file in the local machine. As such it is only concerned with whether the locker is occupied
 or not, NOT with whether the mechanism is locked or not. 
 """
 
 
-def get_all_locker_states() -> dict[str, bool]:
+def record_event(locker_id: str, action: str) -> bool:
+    """
+    Appends an assign/release event to the history file with the current time.
+
+    Args:
+        locker_id: The ID of the locker the event applies to.
+        action: Either "assign" or "release".
+
+    Returns:
+        True if the event was written, False if an error occurred.
+    """
+    try:
+        timestamp = datetime.now().isoformat(timespec='seconds')
+        with open(HISTORY_FILE, 'a') as f:
+            f.write(f"{timestamp},{locker_id},{action}\n")
+        return True
+    except IOError as e:
+        print(f"Error recording event in '{HISTORY_FILE}': {e}")
+        return False
+
+def record_state_changes(previous: dict[str, bool], current: dict[str, bool]):
+    """
+    Records an event for every locker whose state differs between two snapshots,
+    e.g. a locker freed at the ESP32 keypad between two syncs.
+
+    Args:
+        previous: Locker states before the change, as returned by get_all_locker_states.
+        current: Locker states after the change.
+    """
+    for locker_id in previous.keys() | current.keys():
+        was_occupied = previous.get(locker_id, False)
+        is_occupied = current.get(locker_id, False)
+        if is_occupied and not was_occupied:
+            record_event(locker_id, "assign")
+        elif was_occupied and not is_occupied:
+            record_event(locker_id, "release")
+
+def _nest_lockers(data: dict) -> dict:
+    """
+    Returns the details in the ESP32's {"lockers": {...}} layout, so the local file
+    and the synced copy can be compared directly. Older flat files are converted.
+    """
+    if "lockers" in data:
+        return data
+    return {"lockers": data}
+
+def get_all_locker_states(path: str = DATA_FILE) -> dict[str, bool]:
     """
     Reads the data file and returns a dictionary of locker states.
 
     This function is used to determine the initial display of the lockers
     (e.g., red for occupied, green for available).
 
+    The ESP32 stores its lockers as {"lockers": {"locker_id": {...}}}. A flat
+    {"locker_id": {...}} file is read as well. Only occupied lockers are stored
+    and an entry is deleted once the locker is freed, so an entry counts as
+    occupied unless it has "occupied": false.
+
+    Args:
+        path: The details file to read. Defaults to DATA_FILE.
+
     Returns:
         A dictionary where keys are locker IDs and values are booleans
         (True if occupied, False otherwise).
@@ -29,19 +89,19 @@ def get_all_locker_states() -> dict[str, bool]:
     """
     try:
         # If the file doesn't exist, create it with an empty JSON object
-        if not os.path.exists(DATA_FILE):
-            with open(DATA_FILE, 'w') as f:
+        if not os.path.exists(path):
+            with open(path, 'w') as f:
                 json.dump({}, f)
             return {}
             
-        with open(DATA_FILE, 'r') as f:
+        with open(path, 'r') as f:
             data = json.load(f)
         
         # Create a simple dictionary { "locker_id": is_occupied }
-        return {locker_id: info.get('occupied', False) for locker_id, info in data.items()}
+        return {locker_id: info.get('occupied', True) for locker_id, info in _nest_lockers(data)["lockers"].items()}
 
     except (json.JSONDecodeError, FileNotFoundError) as e:
-        print(f"Error reading locker states from '{DATA_FILE}': {e}")
+        print(f"Error reading locker states from '{path}': {e}")
         # In case of an error, assume no lockers are occupied.
         return {}
 
@@ -65,15 +125,15 @@ def assign_locker(locker_id: str, job_number: str, passcode: str) -> str | None:
         # Read the current data
         try:
             with open(DATA_FILE, 'r') as f:
-                data = json.load(f)
+                data = _nest_lockers(json.load(f))
         except (FileNotFoundError, json.JSONDecodeError):
             # If file is missing or corrupt, start with a fresh dictionary
-            data = {}
+            data = {"lockers": {}}
             
-        # Add or update the locker's information
-        data[locker_id] = {
-            "jobid": job_number,
-            "passcode": passcode
+        # Add or update the locker's information, using the same keys as the ESP32
+        data["lockers"][locker_id] = {
+            "password": passcode,
+            "jobid": job_number
         }
         
         # Write the updated data back to the file with pretty printing
@@ -106,12 +166,12 @@ def release_locker(locker_id: str) -> bool:
     try:
         # Read the current data
         with open(DATA_FILE, 'r') as f:
-            data = json.load(f)
+            data = _nest_lockers(json.load(f))
             
         # Check if the locker exists in the data
-        if locker_id in data:
+        if locker_id in data["lockers"]:
             # Remove the locker's entry
-            del data[locker_id]
+            del data["lockers"][locker_id]
             
             # Write the updated data back to the file
             with open(DATA_FILE, 'w') as f:
@@ -0,0 +1,404 @@
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import warnings
+from datetime import datetime
+import numpy as np
+from locker_logic import DATA_FILE, HISTORY_FILE, get_all_locker_states
+
+REPORT_FILE = './data/occupancy_report.json'
+DEFAULT_CAPACITY = 8 # Number of lockers in the GUI grid
+
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 24 * SECONDS_PER_HOUR
+
+VALID_ACTIONS = ("assign", "release")
+
+# Trends smaller than this are treated as flat by the forecast
+FLAT_TREND_LOCKERS_PER_DAY = 1e-6
+
+# Dwell time histogram bucket edges, in hours. The last bucket is open-ended.
+DWELL_BUCKETS_HOURS = np.array([0, 1, 4, 12, 24, 48, 72, 168])
+
+
+"""
+Occupancy analytics for capacity planning. Reads the assign/release history written by locker_logic
+(plus the current details.json snapshot to correct assigns and releases the history missed), turns it
+into columnar NumPy arrays and computes everything in vectorized form, so a year of data runs in well
+under a second.
+
+Timestamps are naive local time, stored as integer seconds. Days and hours are bucketed on local midnight.
+"""
+
+
+# Column layout of the history file, parsed in a single pass by np.loadtxt
+EVENT_DTYPE = [('time', 'datetime64[s]'), ('locker', 'U32'), ('action', 'U8')]
+
+
+def _parse_timestamps(column: np.ndarray) -> np.ndarray:
+    """
+    Converts ISO 8601 strings to datetime64[s]. Values that fail to parse become NaT.
+    A failing chunk is split in half and retried, so k bad values cost O(k log n) vectorized calls.
+    """
+    try:
+        return column.astype('datetime64[s]')
+    except ValueError:
+        if len(column) == 1:
+            return np.array(['NaT'], 'datetime64[s]')
+        mid = len(column) // 2
+        return np.concatenate((_parse_timestamps(column[:mid]), _parse_timestamps(column[mid:])))
+
+
+def _read_rows_leniently(path: str) -> tuple[np.ndarray, int]:
+    """
+    Slow path for a history with malformed rows (e.g. a half-written line), which np.loadtxt rejects.
+
+    Returns:
+        (table, n_rows): an EVENT_DTYPE array where rows with a bad timestamp hold NaT, and the
+        number of non-blank lines read. Rows without exactly three fields are left out of the table.
+    """
+    with open(path, 'r') as f:
+        lines = [line for line in f.read().splitlines() if line.strip()]
+    rows = [line for line in lines if line.count(',') == 2]
+
+    if not rows:
+        return np.zeros(0, EVENT_DTYPE), len(lines)
+    try:
+        # Usually only the field count was wrong (a half-written line), so the rest still parses in one pass
+        return np.loadtxt(rows, delimiter=',', dtype=EVENT_DTYPE, comments=None, ndmin=1), len(lines)
+    except ValueError:
+        text_dtype = [('time', 'U32'), ('locker', 'U32'), ('action', 'U8')]
+        columns = np.loadtxt(rows, delimiter=',', dtype=text_dtype, comments=None, ndmin=1)
+        table = np.zeros(len(rows), EVENT_DTYPE)
+        table['time'] = _parse_timestamps(columns['time'])
+        table['locker'] = columns['locker']
+        table['action'] = columns['action']
+        return table, len(lines)
+
+
+def load_events(path: str = HISTORY_FILE) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Reads the history file into columnar arrays.
+
+    Args:
+        path: CSV file with one "timestamp,locker_id,action" row per event.
+
+    Returns:
+        (times, codes, is_assign, locker_ids) where times are int64 seconds, codes index into
+        locker_ids and is_assign is False for releases. All empty if the file is missing.
+        Rows that do not parse, or whose action is not in VALID_ACTIONS, are skipped with a warning.
+    """
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning) # An empty history is not an error
+            table = np.loadtxt(path, delimiter=',', dtype=EVENT_DTYPE, comments=None, ndmin=1)
+        n_rows = len(table)
+    except FileNotFoundError:
+        print(f"Warning: history file '{path}' not found. Only the snapshot will be used.")
+        table, n_rows = np.zeros(0, EVENT_DTYPE), 0
+    except ValueError:
+        table, n_rows = _read_rows_leniently(path)
+
+    valid = ~np.isnat(table['time']) & np.isin(table['action'], VALID_ACTIONS)
+    skipped = n_rows - int(valid.sum())
+    if skipped:
+        print(f"Warning: skipped {skipped} malformed row(s) in '{path}'")
+
+    table = table[valid]
+    times = table['time'].astype(np.int64)
+    locker_ids, codes = np.unique(table['locker'], return_inverse=True)
+    is_assign = table['action'] == "assign"
+    return times, codes.astype(np.int64), is_assign, locker_ids
+
+
+def load_snapshot(path: str = DATA_FILE) -> list[str] | None:
+    """
+    Returns the IDs of the lockers occupied in a details.json snapshot, as the GUI sees them.
+    Returns None if there is no snapshot, which is not the same as a snapshot with every locker free.
+    """
+    # get_all_locker_states would create a missing file, which a report should not do
+    if not os.path.exists(path):
+        print(f"Warning: snapshot '{path}' not found. Only the history will be used.")
+        return None
+    return [locker_id for locker_id, is_occupied in get_all_locker_states(path).items() if is_occupied]
+
+
+def build_intervals(times: np.ndarray, codes: np.ndarray, is_assign: np.ndarray,
+                    start: int, end: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pairs events into occupancy intervals.
+
+    An assign lasts until the next event for the same locker (a release, or a reassignment that
+    overwrote it). An assign with no later event is still occupied at `end`. A release with no
+    earlier event means the locker was occupied from before `start`.
+
+    Returns:
+        (starts, ends, closed, lockers) where closed is True only for intervals whose full dwell time
+        is known and lockers holds each interval's locker code.
+    """
+    order = np.lexsort((times, codes))
+    t, c, a = times[order], codes[order], is_assign[order]
+
+    same_next = np.zeros(len(t), bool)
+    same_next[:-1] = c[1:] == c[:-1]
+    same_prev = np.zeros(len(t), bool)
+    same_prev[1:] = same_next[:-1]
+    next_t = np.full(len(t), end, np.int64)
+    next_t[:-1] = t[1:]
+
+    orphan_release = ~a & ~same_prev
+    starts = np.concatenate((t[a], np.full(orphan_release.sum(), start, np.int64)))
+    ends = np.concatenate((np.where(same_next, next_t, end)[a], t[orphan_release]))
+    closed = np.concatenate((same_next[a], np.zeros(orphan_release.sum(), bool)))
+    lockers = np.concatenate((c[a], c[orphan_release]))
+    return starts, ends, closed, lockers
+
+
+def reconcile_snapshot(times: np.ndarray, codes: np.ndarray, is_assign: np.ndarray, locker_ids: np.ndarray,
+                       snapshot_ids: list[str], start: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Compares the last logged event of every locker with the snapshot.
+
+    A snapshot-occupied locker with no events is taken as occupied since `start`. One whose last
+    event is a release was assigned without it being recorded, so it is taken as occupied since
+    that release.
+
+    Returns:
+        (seeded_starts, missed_release) where seeded_starts are the start times of those extra
+        intervals and missed_release flags, per locker code, lockers whose last event is an assign
+        but which the snapshot shows as free.
+    """
+    snapshot_ids = np.asarray(snapshot_ids, dtype=str)
+    last_time = np.full(len(locker_ids), start, np.int64)
+    last_assign = np.zeros(len(locker_ids), bool)
+
+    order = np.lexsort((times, codes))
+    c = codes[order]
+    is_last = np.ones(len(c), bool)
+    is_last[:-1] = c[1:] != c[:-1]
+    last_time[c[is_last]] = times[order][is_last]
+    last_assign[c[is_last]] = is_assign[order][is_last]
+
+    known = np.isin(snapshot_ids, locker_ids)
+    idx = np.searchsorted(locker_ids, snapshot_ids[known])
+    seeded_starts = np.concatenate((last_time[idx][~last_assign[idx]], np.full(int((~known).sum()), start, np.int64)))
+    missed_release = last_assign & ~np.isin(locker_ids, snapshot_ids)
+    return seeded_starts, missed_release
+
+
+def concurrency_steps(starts: np.ndarray, ends: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns (change_times, levels): the number of occupied lockers right after each change.
+    Releases sort before assigns at the same instant so a handover is not counted twice.
+    """
+    change_times = np.concatenate((starts, ends))
+    deltas = np.concatenate((np.ones(len(starts), np.int64), -np.ones(len(ends), np.int64)))
+    order = np.lexsort((deltas, change_times))
+    return change_times[order], np.cumsum(deltas[order])
+
+
+def occupancy_integral(change_times: np.ndarray, levels: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """Returns the occupied locker-seconds accumulated up to each of the (sorted) points."""
+    area = np.concatenate(([0], np.cumsum(levels[:-1] * np.diff(change_times))))
+    k = np.searchsorted(change_times, points, side='right') - 1
+    kc = np.clip(k, 0, None)
+    integral = area[kc] + levels[kc] * (points - change_times[kc])
+    return np.where(k < 0, 0, integral)
+
+
+def hourly_occupancy(change_times: np.ndarray, levels: np.ndarray,
+                     start: int, n_hours: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Buckets the concurrency curve into hours.
+
+    Returns:
+        (mean_occupancy, peak_occupancy) per hour since `start`.
+    """
+    edges = start + SECONDS_PER_HOUR * np.arange(n_hours + 1, dtype=np.int64)
+    mean_occupancy = np.diff(occupancy_integral(change_times, levels, edges)) / SECONDS_PER_HOUR
+
+    # Peak in an hour is the level at its start or any level reached inside it
+    k = np.searchsorted(change_times, edges[:-1], side='right') - 1
+    peak_occupancy = np.where(k < 0, 0, levels[np.clip(k, 0, None)])
+    bins = (change_times - start) // SECONDS_PER_HOUR
+    inside = (bins >= 0) & (bins < n_hours)
+    np.maximum.at(peak_occupancy, bins[inside], levels[inside])
+    return mean_occupancy, peak_occupancy
+
+
+def dwell_time_distribution(durations_hours: np.ndarray) -> dict:
+    """Summary statistics and a bucketed histogram of dwell times."""
+    if len(durations_hours) == 0:
+        return {"count": 0}
+
+    bucket = np.searchsorted(DWELL_BUCKETS_HOURS, durations_hours, side='right') - 1
+    counts = np.bincount(bucket, minlength=len(DWELL_BUCKETS_HOURS))
+    labels = [f"{lo}-{hi}h" for lo, hi in zip(DWELL_BUCKETS_HOURS[:-1], DWELL_BUCKETS_HOURS[1:])]
+    labels.append(f"{DWELL_BUCKETS_HOURS[-1]}h+")
+    p50, p90, p95 = np.percentile(durations_hours, [50, 90, 95])
+    return {
+        "count": int(len(durations_hours)),
+        "mean_hours": round(float(durations_hours.mean()), 2),
+        "median_hours": round(float(p50), 2),
+        "p90_hours": round(float(p90), 2),
+        "p95_hours": round(float(p95), 2),
+        "max_hours": round(float(durations_hours.max()), 2),
+        "histogram": dict(zip(labels, counts.tolist())),
+    }
+
+
+def forecast_lockers_needed(daily_peak: np.ndarray, start: int, capacity: int,
+                            horizon_days: int, headroom: float) -> dict:
+    """
+    Fits a linear trend to the daily peak concurrency and projects it `horizon_days` ahead.
+    The 95th percentile residual is added on top so the estimate covers busy days, not average ones.
+    """
+    days = np.arange(len(daily_peak))
+    if len(daily_peak) >= 2:
+        slope, intercept = np.polyfit(days, daily_peak, 1)
+    else:
+        slope, intercept = 0.0, float(daily_peak[0])
+    # A flat series fits with a slope of ~1e-16, which would put capacity billions of days out
+    if abs(slope) < FLAT_TREND_LOCKERS_PER_DAY:
+        slope = 0.0
+    busy_day_margin = max(float(np.percentile(daily_peak - (intercept + slope * days), 95)), 0.0)
+
+    horizon_day = days[-1] + horizon_days
+    projected_peak = max(intercept + slope * horizon_day + busy_day_margin, 0.0)
+    lockers_needed = math.ceil(projected_peak * (1 + headroom))
+
+    # First day the busy-day trend reaches capacity (the start of the period if it already had)
+    full_on = None
+    if slope > 0:
+        full_day = max(math.ceil((capacity - intercept - busy_day_margin) / slope), 0)
+        full_on = str(np.datetime64(start + full_day * SECONDS_PER_DAY, 's').astype('datetime64[D]'))
+
+    return {
+        "trend_lockers_per_day": round(float(slope), 4),
+        "horizon_days": horizon_days,
+        "projected_peak": round(float(projected_peak), 2),
+        "headroom": headroom,
+        "lockers_needed": lockers_needed,
+        "lockers_to_add": max(lockers_needed - capacity, 0),
+        "capacity_reached_on": full_on,
+    }
+
+
+def build_report(times: np.ndarray, codes: np.ndarray, is_assign: np.ndarray, locker_ids: np.ndarray,
+                 snapshot_ids: list[str] | None, end: int, capacity: int = DEFAULT_CAPACITY,
+                 horizon_days: int = 90, headroom: float = 0.1) -> dict:
+    """
+    Computes the full occupancy report from the event arrays and the current snapshot.
+
+    Args:
+        times, codes, is_assign, locker_ids: Output of load_events.
+        snapshot_ids: Output of load_snapshot, or None to use the history alone. Occupied lockers
+            the history does not account for are seeded as described in reconcile_snapshot. Open
+            intervals of lockers the snapshot shows as free are ended after the median known dwell
+            time, since their release was missed.
+        end: Report end time, in seconds. Events after it are ignored.
+        capacity: Number of lockers available.
+        horizon_days: How far ahead to forecast.
+        headroom: Fraction of spare lockers to keep on top of the projected peak.
+
+    Returns:
+        A JSON-serialisable dictionary.
+    """
+    keep = times <= end
+    times, codes, is_assign = times[keep], codes[keep], is_assign[keep]
+    first = times.min() if len(times) else end - SECONDS_PER_DAY
+    start = int(first // SECONDS_PER_DAY * SECONDS_PER_DAY)
+
+    starts, ends, closed, lockers = build_intervals(times, codes, is_assign, start, end)
+    if snapshot_ids is not None:
+        seeded, missed_release = reconcile_snapshot(times, codes, is_assign, locker_ids, snapshot_ids, start)
+        unfinished = missed_release[lockers] & ~closed & (ends == end)
+        typical_dwell = int(np.median((ends - starts)[closed])) if closed.any() else 0
+        ends[unfinished] = np.minimum(starts[unfinished] + typical_dwell, end)
+
+        starts = np.concatenate((starts, seeded))
+        ends = np.concatenate((ends, np.full(len(seeded), end, np.int64)))
+        closed = np.concatenate((closed, np.zeros(len(seeded), bool)))
+
+    n_hours = max((end - start) // SECONDS_PER_HOUR, 1)
+    if len(starts):
+        change_times, levels = concurrency_steps(starts, ends)
+    else:
+        change_times, levels = np.array([start], np.int64), np.zeros(1, np.int64)
+    mean_occupancy, peak_occupancy = hourly_occupancy(change_times, levels, start, n_hours)
+
+    hour_starts = start + SECONDS_PER_HOUR * np.arange(n_hours, dtype=np.int64)
+    hour_of_day = (hour_starts // SECONDS_PER_HOUR) % 24
+    weekday = (hour_starts // SECONDS_PER_DAY + 3) % 7 # 1970-01-01 was a Thursday; Monday is 0
+
+    hours_seen = np.bincount(hour_of_day, minlength=24)
+    mean_by_hour = np.bincount(hour_of_day, weights=mean_occupancy, minlength=24) / np.maximum(hours_seen, 1)
+    peak_by_hour = np.zeros(24, np.int64)
+    np.maximum.at(peak_by_hour, hour_of_day, peak_occupancy)
+
+    slot = weekday * 24 + hour_of_day
+    slots_seen = np.bincount(slot, minlength=7 * 24)
+    mean_by_slot = np.bincount(slot, weights=mean_occupancy, minlength=7 * 24) / np.maximum(slots_seen, 1)
+    weekday_names = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+    busiest_slots = [
+        {"weekday": weekday_names[s // 24], "hour": int(s % 24), "mean_occupancy": round(float(mean_by_slot[s]), 2)}
+        for s in np.argsort(mean_by_slot)[::-1][:5]
+    ]
+
+    daily_peak = np.maximum.reduceat(peak_occupancy, np.arange(0, n_hours, 24))
+    peak_index = int(np.argmax(levels))
+
+    return {
+        "period": {
+            "start": str(np.datetime64(start, 's')),
+            "end": str(np.datetime64(end, 's')),
+            "events": int(len(times)),
+        },
+        "capacity": capacity,
+        "peak_concurrency": {
+            "lockers": int(levels[peak_index]),
+            "at": str(np.datetime64(int(change_times[peak_index]), 's')),
+            "utilisation": round(float(levels[peak_index]) / capacity, 3) if capacity else None,
+        },
+        "hourly_occupancy": {
+            "mean": np.round(mean_by_hour, 3).tolist(),
+            "peak": peak_by_hour.tolist(),
+        },
+        "busiest_slots": busiest_slots,
+        "dwell_time": dwell_time_distribution((ends - starts)[closed] / SECONDS_PER_HOUR),
+        "forecast": forecast_lockers_needed(daily_peak, start, capacity, horizon_days, headroom),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Write a locker occupancy and capacity planning report.")
+    parser.add_argument("--history", default=HISTORY_FILE, help="assign/release history CSV")
+    parser.add_argument("--snapshot", default=DATA_FILE, help="current details.json snapshot")
+    parser.add_argument("--output", default=REPORT_FILE, help="where to write the JSON report")
+    parser.add_argument("--until", default=None, help="report end time (ISO 8601), defaults to now")
+    parser.add_argument("--capacity", type=int, default=DEFAULT_CAPACITY, help="number of lockers available")
+    parser.add_argument("--horizon-days", type=int, default=90, help="how far ahead to forecast")
+    parser.add_argument("--headroom", type=float, default=0.1, help="spare fraction on top of the projected peak")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    until = args.until or datetime.now().isoformat(timespec='seconds')
+    end = int(np.datetime64(until, 's').astype(np.int64))
+    times, codes, is_assign, locker_ids = load_events(args.history)
+    report = build_report(times, codes, is_assign, locker_ids, load_snapshot(args.snapshot), end,
+                          capacity=args.capacity, horizon_days=args.horizon_days, headroom=args.headroom)
+
+    try:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=4)
+    except IOError as e:
+        print(f"Error writing report to '{args.output}': {e}")
+        sys.exit(1)
+
+    forecast = report["forecast"]
+    print(f"Report for {report['period']['events']} events written to '{args.output}' in {time.perf_counter() - started:.3f}s")
+    print(f"Peak concurrency: {report['peak_concurrency']['lockers']} lockers at {report['peak_concurrency']['at']}")
+    print(f"Lockers needed in {forecast['horizon_days']} days: {forecast['lockers_needed']} (add {forecast['lockers_to_add']})")
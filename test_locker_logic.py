@@ -0,0 +1,54 @@
+import json
+import locker_logic
+
+
+def write_details(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+
+def test_get_all_locker_states_reads_firmware_format(tmp_path):
+    # Format written by editLockerData in LockerIno/FileManager.cpp
+    details = tmp_path / "details.json"
+    write_details(details, {"lockers": {"101": {"password": "1234", "jobid": "2510019"},
+                                        "203": {"password": "9876", "jobid": "2510020"}}})
+
+    assert locker_logic.get_all_locker_states(str(details)) == {"101": True, "203": True}
+
+
+def test_get_all_locker_states_empty_firmware_file(tmp_path):
+    details = tmp_path / "details.json"
+    write_details(details, {"lockers": {}})
+
+    assert locker_logic.get_all_locker_states(str(details)) == {}
+
+
+def test_get_all_locker_states_reads_flat_format(tmp_path):
+    details = tmp_path / "details.json"
+    write_details(details, {"101": {"jobid": "1", "passcode": "1234"}, "102": {"occupied": False}})
+
+    assert locker_logic.get_all_locker_states(str(details)) == {"101": True, "102": False}
+
+
+def test_record_state_changes(tmp_path, monkeypatch):
+    history = tmp_path / "history.csv"
+    monkeypatch.setattr(locker_logic, "HISTORY_FILE", str(history))
+
+    locker_logic.record_state_changes({"101": True, "102": True}, {"102": True, "103": True})
+
+    events = sorted(line.split(',')[1:] for line in history.read_text().splitlines())
+    assert events == [["101", "release"], ["103", "assign"]]
+
+
+def test_assign_and_release_keep_firmware_format(tmp_path, monkeypatch):
+    details = tmp_path / "details.json"
+    write_details(details, {"lockers": {"101": {"password": "1234", "jobid": "2510019"}}})
+    monkeypatch.setattr(locker_logic, "DATA_FILE", str(details))
+
+    locker_logic.assign_locker("102", "2510020", "5678")
+    assert json.loads(details.read_text()) == {"lockers": {"101": {"password": "1234", "jobid": "2510019"},
+                                                           "102": {"password": "5678", "jobid": "2510020"}}}
+
+    assert locker_logic.release_locker("101")
+    assert json.loads(details.read_text()) == {"lockers": {"102": {"password": "5678", "jobid": "2510020"}}}
+
@@ -0,0 +1,146 @@
+import time
+import numpy as np
+import pytest
+import occupancy_analytics as oa
+
+
+def ts(value: str) -> int:
+    return int(np.datetime64(value, 's').astype(np.int64))
+
+
+DAY = "2026-01-05" # a Monday
+START = ts(f"{DAY}T00:00")
+END = ts("2026-01-06T00:00")
+
+# 101: 09-11 and 12-end, 102: 10-14, 103: released at 08 with no earlier assign
+HISTORY = [
+    (f"{DAY}T08:00:00", "103", "release"),
+    (f"{DAY}T09:00:00", "101", "assign"),
+    (f"{DAY}T10:00:00", "102", "assign"),
+    (f"{DAY}T11:00:00", "101", "release"),
+    (f"{DAY}T12:00:00", "101", "assign"),
+    (f"{DAY}T14:00:00", "102", "release"),
+]
+
+
+@pytest.fixture
+def events(tmp_path):
+    history = tmp_path / "history.csv"
+    history.write_text("".join(f"{t},{locker},{action}\n" for t, locker, action in HISTORY))
+    return oa.load_events(str(history))
+
+
+def intervals_by_locker(events, starts, ends, closed, lockers):
+    locker_ids = events[3]
+    return sorted((str(locker_ids[l]), int(s - START) // 3600, int(e - START) // 3600, bool(c))
+                  for s, e, c, l in zip(starts, ends, closed, lockers))
+
+
+def test_load_events_skips_malformed_rows(tmp_path):
+    history = tmp_path / "history.csv"
+    history.write_text(
+        "2026-01-05T09:00:00,101,assign\n"
+        "garbage,101,assign\n"
+        "2026-01-05T10:00:00,101,unlock\n"
+        "2026-01-05T11:0\n"
+        "2026-01-05T12:00:00,101,release\n"
+    )
+    times, codes, is_assign, locker_ids = oa.load_events(str(history))
+
+    assert times.tolist() == [ts("2026-01-05T09:00"), ts("2026-01-05T12:00")]
+    assert is_assign.tolist() == [True, False]
+    assert locker_ids.tolist() == ["101"]
+
+
+def test_build_intervals(events):
+    times, codes, is_assign, _ = events
+    result = oa.build_intervals(times, codes, is_assign, START, END)
+
+    assert intervals_by_locker(events, *result) == [
+        ("101", 9, 11, True),
+        ("101", 12, 24, False), # still occupied at the end
+        ("102", 10, 14, True),
+        ("103", 0, 8, False),   # occupied from before the history started
+    ]
+
+
+def test_reconcile_snapshot(events):
+    times, codes, is_assign, locker_ids = events
+    # 102 was re-assigned without it being logged, 104 has no events, 101 was freed without it being logged
+    seeded, missed_release = oa.reconcile_snapshot(times, codes, is_assign, locker_ids, ["102", "104"], START)
+
+    assert sorted((seeded - START) // 3600) == [0, 14]
+    assert locker_ids[missed_release].tolist() == ["101"]
+
+
+def test_build_report(events):
+    report = oa.build_report(*events, ["101", "104"], END, capacity=8)
+
+    # 103 and 104 from midnight, 101 at 09-11 and 12-24, 102 at 10-14
+    expected = [2] * 8 + [1, 2, 3, 2, 3, 3] + [2] * 10
+    assert report["hourly_occupancy"]["mean"] == expected
+    # Every change falls on the hour, so each hour's peak is its level
+    assert report["hourly_occupancy"]["peak"] == expected
+    assert report["peak_concurrency"] == {"lockers": 3, "at": f"{DAY}T10:00:00", "utilisation": 0.375}
+    assert report["busiest_slots"][0]["weekday"] == "Mon"
+
+    dwell = report["dwell_time"]
+    assert dwell["count"] == 2
+    assert dwell["median_hours"] == 3
+    assert dwell["histogram"]["1-4h"] == 1
+    assert dwell["histogram"]["4-12h"] == 1
+
+
+def test_build_report_closes_missed_release(events):
+    # 101 is free in the snapshot, so its 12:00 assign ends after the median dwell of 3h
+    report = oa.build_report(*events, ["104"], END, capacity=8)
+
+    assert report["hourly_occupancy"]["mean"][12:] == [3, 3, 2] + [1] * 9
+    assert report["dwell_time"]["count"] == 2
+
+
+def test_build_report_without_snapshot(events):
+    report = oa.build_report(*events, None, END, capacity=8)
+
+    assert report["hourly_occupancy"]["mean"] == [1] * 8 + [0, 1, 2, 1, 2, 2] + [1] * 10
+
+
+def test_forecast_rising_trend():
+    forecast = oa.forecast_lockers_needed(np.array([1, 3, 5, 7]), START, capacity=8, horizon_days=10, headroom=0.1)
+
+    assert forecast["projected_peak"] == pytest.approx(27)
+    assert forecast["lockers_needed"] == 30
+    assert forecast["lockers_to_add"] == 22
+    assert forecast["capacity_reached_on"] == "2026-01-09"
+
+
+@pytest.mark.parametrize("days", [3, 30, 365])
+def test_forecast_flat_trend(days):
+    forecast = oa.forecast_lockers_needed(np.full(days, 5), START, capacity=8, horizon_days=90, headroom=0.1)
+
+    assert forecast["trend_lockers_per_day"] == 0
+    assert forecast["lockers_needed"] == 6
+    assert forecast["capacity_reached_on"] is None
+
+
+@pytest.mark.parametrize("tail", ["", "2026-01-01T00:0\n"], ids=["clean", "half-written line"])
+def test_one_year_runs_under_a_second(tmp_path, tail):
+    # 50 lockers with alternating assign/release events spread over a year: 200k events
+    rng = np.random.default_rng(0)
+    year_start = ts("2025-01-01T00:00")
+    per_locker = 4000
+    times = np.sort(rng.integers(0, 365 * oa.SECONDS_PER_DAY, (50, per_locker)), axis=1) + year_start
+    lockers = np.repeat(np.arange(100, 150), per_locker)
+    actions = np.tile(["assign", "release"], 50 * per_locker // 2)
+    stamps = times.ravel().astype('datetime64[s]').astype(str)
+    history = tmp_path / "history.csv"
+    history.write_text("\n".join(f"{t},{l},{a}" for t, l, a in zip(stamps, lockers, actions)) + "\n" + tail)
+
+    started = time.perf_counter()
+    events = oa.load_events(str(history))
+    report = oa.build_report(*events, [], year_start + 365 * oa.SECONDS_PER_DAY, capacity=50)
+    elapsed = time.perf_counter() - started
+
+    assert report["period"]["events"] == 50 * per_locker
+    assert report["dwell_time"]["count"] == 50 * per_locker // 2
+    assert elapsed < 1.0
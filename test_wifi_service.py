@@ -0,0 +1,49 @@
+import json
+import locker_logic
+import wifi_service
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+def make_manager(tmp_path, monkeypatch, esp32_details):
+    details = tmp_path / "details.json"
+    monkeypatch.setattr(wifi_service, "DATA_FILE", str(details))
+    monkeypatch.setattr(wifi_service, "DATA_FILE_TMP", str(tmp_path / "details.json.tmp"))
+    monkeypatch.setattr(locker_logic, "DATA_FILE", str(details))
+    monkeypatch.setattr(locker_logic, "HISTORY_FILE", str(tmp_path / "history.csv"))
+    monkeypatch.setattr(wifi_service.requests, "get", lambda url, timeout: FakeResponse(esp32_details))
+    return wifi_service.ESP32detailsManager("127.0.0.1")
+
+
+def read_events(tmp_path):
+    history = tmp_path / "history.csv"
+    if not history.exists():
+        return []
+    return sorted(line.split(',')[1:] for line in history.read_text().splitlines())
+
+
+def test_sync_records_lockers_freed_at_the_keypad(tmp_path, monkeypatch):
+    manager = make_manager(tmp_path, monkeypatch, {"lockers": {"102": {"password": "5678", "jobid": "2"}}})
+    (tmp_path / "details.json").write_text(json.dumps(
+        {"lockers": {"101": {"password": "1234", "jobid": "1"}, "102": {"password": "5678", "jobid": "2"}}}))
+
+    assert manager.sync_from_esp32()
+    assert read_events(tmp_path) == [["101", "release"]]
+
+
+def test_sync_after_local_assign_records_nothing(tmp_path, monkeypatch):
+    manager = make_manager(tmp_path, monkeypatch, {"lockers": {"102": {"password": "5678", "jobid": "2"}}})
+    (tmp_path / "details.json").write_text(json.dumps({"lockers": {}}))
+    locker_logic.assign_locker("102", "2", "5678")
+
+    assert manager.sync_from_esp32()
+    assert read_events(tmp_path) == []
@@ -2,6 +2,7 @@ import requests
 import json
 import os
 import shutil
+import locker_logic
 
 DATA_FILE = './data/details.json'
 DATA_FILE_TMP = './data/details.json.tmp'
@@ -28,12 +29,19 @@ class ESP32detailsManager:
             response = requests.get(self.get_url, timeout=5)
             response.raise_for_status()
 
+            # Compare against the previous copy so changes made at the ESP32 end up in the history.
+            # On the very first sync there is nothing to compare against, so nothing is recorded.
+            previous_states = locker_logic.get_all_locker_states(self.local_file) if os.path.exists(self.local_file) else None
+
             self.make_backup()
 
             with open(self.local_file, 'w') as f:
                 json.dump(response.json(), f, indent=4)
             print(f"   Success! Synced and saved details to '{self.local_file}'")
 
+            if previous_states is not None:
+                locker_logic.record_state_changes(previous_states, locker_logic.get_all_locker_states(self.local_file))
+
             self.delete_backup()
             return True
         except requests.exceptions.RequestException as e: